@@ -8,9 +8,19 @@
 # Forked from https://github.com/eriknyquist/generate_life_calendar
 
 import argparse
+import calendar
+import collections
+import concurrent.futures
+import contextlib
 import datetime
+import functools
+import itertools
+import json
 import math
 import os
+import re
+import shutil
+import struct
 import tempfile
 import urllib.parse
 import urllib.request
@@ -22,10 +32,56 @@ DEFAULT_TITLE: str = "LIFE CALENDAR"
 DEFAULT_FILENAME: str = "life_calendar.pdf"
 DEFAULT_AGE: int = 100
 DEFAULT_A_SIZE: int = 2
+# Dates with the same separator between year, month and day, in either YMD or DMY order
+# (ASCII digits only, as strptime accepts)
+YMD_DATE_PATTERN: re.Pattern[str] = re.compile(r"(\d{4})([/-])(\d{1,2})\2(\d{1,2})", re.ASCII)
+DMY_DATE_PATTERN: re.Pattern[str] = re.compile(r"(\d{1,2})([/-])(\d{1,2})\2(\d{4})", re.ASCII)
+WEEK: datetime.timedelta = datetime.timedelta(weeks=1)
+# Lowercase Roman numerals used for months in row labels
+MONTH_NUMERALS: tuple[str, ...] = (
+    "i",
+    "ii",
+    "iii",
+    "iv",
+    "v",
+    "vi",
+    "vii",
+    "viii",
+    "ix",
+    "x",
+    "xi",
+    "xii",
+)
+# Lowercase weekday names, indexed by date.weekday(), used for the grid header
+WEEKDAY_NAMES: tuple[str, ...] = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
 
 REMOTE_REPO_RAW_BASE = "https://raw.githubusercontent.com/martimlobao/life-calendar/main"
 FONT_BASE_URL_ENV_VAR = "LIFE_CALENDAR_FONT_BASE_URL"
 FONT_FILENAMES: tuple[str, ...] = ("EBGaramondSC08-Regular.otf",)
+# Family names of the bundled fonts, so they never need to be read from the font files
+FONT_FAMILIES_BUILTIN: dict[str, str] = {"EBGaramondSC08-Regular.otf": "EB Garamond SC 08"}
+FONT_FAMILY_CACHE_FILENAME = "font_families.json"
+
+# OpenType table directory and `name` table layouts
+_SFNT_NUM_TABLES = struct.Struct(">H")
+_TABLE_RECORD = struct.Struct(">4sLLL")  # tag, checksum, offset, length
+_NAME_TABLE_HEADER = struct.Struct(">HHH")  # format, count, string storage offset
+_NAME_RECORD = struct.Struct(">HHHHHH")  # platform, encoding, language, name ID, length, offset
+# Name string codecs indexed by platform ID (Unicode, Macintosh, ISO, Windows)
+_NAME_CODECS: tuple[str | None, ...] = ("utf-16-be", "mac_roman", None, "utf-16-be")
+
+
+def _user_cache_directory() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "life_calendar"
 
 
 def _download_font(destination: Path, filename: str) -> None:
@@ -37,11 +93,26 @@ def _download_font(destination: Path, filename: str) -> None:
     if parsed.scheme not in ("http", "https"):
         raise ValueError(f"Unsafe URL scheme '{parsed.scheme}'. Only http and https are allowed.")
 
+    # Ask for the raw file so it can be streamed straight to disk
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "identity"})  # noqa: S310
+    # Download to a file of our own next to the destination and rename it once complete, so an
+    # interrupted download never leaves a truncated font behind in the persistent cache and
+    # concurrent first runs never write to the same file
+    fd, partial_name = tempfile.mkstemp(dir=destination.parent, suffix=".part")
+    partial_path = Path(partial_name)
     try:
-        with urllib.request.urlopen(url) as response, destination.open("wb") as file_obj:  # noqa: S310
-            file_obj.write(response.read())
+        with (
+            os.fdopen(fd, "wb") as file_obj,
+            urllib.request.urlopen(request) as response,  # noqa: S310
+        ):
+            shutil.copyfileobj(response, file_obj, length=1 << 16)
+        partial_path.replace(destination)
     except OSError as exc:  # Includes URLError and filesystem issues
         raise RuntimeError(f"Unable to download font '{filename}' from {url}") from exc
+    finally:
+        # Whatever interrupted the download, never leave the partial file behind (once renamed
+        # into place there is nothing left to remove)
+        partial_path.unlink(missing_ok=True)
 
 
 def _ensure_font_directory() -> Path:
@@ -52,12 +123,29 @@ def _ensure_font_directory() -> Path:
     ):
         return local_font_dir
 
-    tmp_dir = Path(tempfile.mkdtemp(prefix="life_calendar_fonts_"))
-    for font_name in FONT_FILENAMES:
-        font_path = tmp_dir / font_name
-        if not font_path.is_file():
-            _download_font(font_path, font_name)
-    return tmp_dir
+    # Reuse fonts downloaded by previous runs, falling back to a throwaway directory when the
+    # user cache is not writable
+    font_dir = _user_cache_directory() / "font"
+    try:
+        font_dir.mkdir(parents=True, exist_ok=True)
+        # mkdir succeeds on an existing read-only directory, so check that files can be created
+        with tempfile.TemporaryFile(dir=font_dir):
+            pass
+    except OSError:
+        font_dir = Path(tempfile.mkdtemp(prefix="life_calendar_fonts_"))
+    missing_fonts = [
+        (font_dir / font_name, font_name)
+        for font_name in FONT_FILENAMES
+        if not (font_dir / font_name).is_file()
+    ]
+    if len(missing_fonts) == 1:
+        _download_font(*missing_fonts[0])
+    elif missing_fonts:
+        # Overlap the downloads so fetching several fonts takes as long as the slowest one
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(missing_fonts))) as pool:
+            for future in [pool.submit(_download_font, *missing) for missing in missing_fonts]:
+                future.result()
+    return font_dir
 
 
 def _configure_fontconfig(font_dir: Path) -> None:
@@ -69,7 +157,8 @@ def _configure_fontconfig(font_dir: Path) -> None:
     fonts_conf_path = config_dir / "fonts.conf"
 
     includes: list[str] = []
-    if previous_config:
+    # Never include this file from itself, which happens if it is configured twice
+    if previous_config and previous_config != str(fonts_conf_path):
         includes.append(previous_config)
     else:
         includes.append("/etc/fonts/fonts.conf")
@@ -82,7 +171,11 @@ def _configure_fontconfig(font_dir: Path) -> None:
         f"  <cachedir>{cache_dir}</cachedir>",
         "</fontconfig>",
     ))
-    fonts_conf_path.write_text("\n".join(fonts_conf_lines), encoding="utf-8")
+    fonts_conf = "\n".join(fonts_conf_lines).encode()
+    # Only rewrite the file when its contents change, e.g. when a different FONTCONFIG_FILE has
+    # to be included
+    if not (fonts_conf_path.is_file() and fonts_conf_path.read_bytes() == fonts_conf):
+        fonts_conf_path.write_bytes(fonts_conf)
     os.environ["FONTCONFIG_FILE"] = str(fonts_conf_path)
 
 
@@ -93,23 +186,19 @@ def _read_font_family_name(font_path: Path) -> str | None:
     if len(data) < 12:
         return None
 
-    num_tables = int.from_bytes(data[4:6], "big", signed=False)
-    record_offset = 12
+    (num_tables,) = _SFNT_NUM_TABLES.unpack_from(data, 4)
 
     name_table_offset = None
     name_table_length = None
 
-    for _ in range(num_tables):
-        if record_offset + 16 > len(data):
+    for record_offset in range(12, 12 + num_tables * _TABLE_RECORD.size, _TABLE_RECORD.size):
+        if record_offset + _TABLE_RECORD.size > len(data):
             return None
-        tag = data[record_offset : record_offset + 4]
-        offset = int.from_bytes(data[record_offset + 8 : record_offset + 12], "big")
-        length = int.from_bytes(data[record_offset + 12 : record_offset + 16], "big")
+        tag, _, offset, length = _TABLE_RECORD.unpack_from(data, record_offset)
         if tag == b"name":
             name_table_offset = offset
             name_table_length = length
             break
-        record_offset += 16
 
     if (name_table_offset is None) or (name_table_length is None):
         return None
@@ -119,38 +208,17 @@ def _read_font_family_name(font_path: Path) -> str | None:
         return None
 
     name_table = data[name_table_offset:end_offset]
-    if len(name_table) < 6:
+    if len(name_table) < _NAME_TABLE_HEADER.size:
         return None
 
-    count = int.from_bytes(name_table[2:4], "big")
-    string_storage_offset = int.from_bytes(name_table[4:6], "big")
-
-    def _decode_name(raw: bytes, platform_id: int) -> str | None:
-        if platform_id in {0, 3}:
-            try:
-                return raw.decode("utf-16-be")
-            except UnicodeDecodeError:
-                return None
-        if platform_id == 1:
-            try:
-                return raw.decode("mac_roman")
-            except UnicodeDecodeError:
-                return None
-        return None
+    _, count, string_storage_offset = _NAME_TABLE_HEADER.unpack_from(name_table)
+    count = min(count, (len(name_table) - _NAME_TABLE_HEADER.size) // _NAME_RECORD.size)
+    records_end = _NAME_TABLE_HEADER.size + count * _NAME_RECORD.size
 
     best_match: tuple[int, str] | None = None
-    for index in range(count):
-        start = 6 + index * 12
-        end = start + 12
-        if end > len(name_table):
-            break
-        platform_id = int.from_bytes(name_table[start : start + 2], "big")
-        encoding_id = int.from_bytes(name_table[start + 2 : start + 4], "big")
-        language_id = int.from_bytes(name_table[start + 4 : start + 6], "big")
-        name_id = int.from_bytes(name_table[start + 6 : start + 8], "big")
-        length = int.from_bytes(name_table[start + 8 : start + 10], "big")
-        offset = int.from_bytes(name_table[start + 10 : start + 12], "big")
-
+    for platform_id, encoding_id, language_id, name_id, length, offset in _NAME_RECORD.iter_unpack(
+        name_table[_NAME_TABLE_HEADER.size : records_end]
+    ):
         if name_id != 1:
             continue
 
@@ -159,8 +227,13 @@ def _read_font_family_name(font_path: Path) -> str | None:
         if string_end > len(name_table):
             continue
 
-        raw_bytes = name_table[string_start:string_end]
-        decoded = _decode_name(raw_bytes, platform_id)
+        codec = _NAME_CODECS[platform_id] if platform_id < len(_NAME_CODECS) else None
+        if codec is None:
+            continue
+        try:
+            decoded = name_table[string_start:string_end].decode(codec)
+        except UnicodeDecodeError:
+            continue
         if not decoded:
             continue
 
@@ -183,23 +256,92 @@ def _read_font_family_name(font_path: Path) -> str | None:
     return None
 
 
+def _load_font_family_cache(cache_path: Path) -> dict[str, list]:
+    with contextlib.suppress(OSError, ValueError):
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+        if isinstance(cache, dict):
+            return cache
+    return {}
+
+
 def _discover_font_families(font_dir: Path) -> list[str]:
+    # Family names of other fonts are cached per font file, keyed by modification time and size,
+    # so the name table only needs to be parsed again when a font changes
+    cache_path = _user_cache_directory() / FONT_FAMILY_CACHE_FILENAME
+    cache: dict[str, list] | None = None
+    cache_updated = False
+
     families: list[str] = []
     seen: set[str] = set()
     for font_filename in FONT_FILENAMES:
         font_path = font_dir / font_filename
         if not font_path.is_file():
             continue
-        family = _read_font_family_name(font_path)
+        if font_filename in FONT_FAMILIES_BUILTIN:
+            family = FONT_FAMILIES_BUILTIN[font_filename]
+            if family not in seen:
+                families.append(family)
+                seen.add(family)
+            continue
+
+        if cache is None:
+            cache = _load_font_family_cache(cache_path)
+        stat = font_path.stat()
+        cache_key = str(font_path.resolve())
+        cached = cache.get(cache_key)
+        # Malformed entries are treated as a miss, like a corrupt cache file
+        if (
+            isinstance(cached, list)
+            and len(cached) == 3  # noqa: PLR2004
+            and cached[:2] == [stat.st_mtime_ns, stat.st_size]
+            and isinstance(cached[2], str | None)
+        ):
+            family = cached[2]
+        else:
+            family = _read_font_family_name(font_path)
+            cache[cache_key] = [stat.st_mtime_ns, stat.st_size, family]
+            cache_updated = True
         if family and family not in seen:
             families.append(family)
             seen.add(family)
+
+    if cache is not None and cache_updated:
+        with contextlib.suppress(OSError):
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(cache), encoding="utf-8")
     return families
 
 
-FONT_DIRECTORY: Path = _ensure_font_directory()
-_configure_fontconfig(FONT_DIRECTORY)
-FONT_FAMILIES: list[str] = _discover_font_families(FONT_DIRECTORY)
+@functools.cache
+def _font_setup() -> list[str]:
+    # Deferred until a calendar is rendered so that `--help` and argument errors never pay for
+    # font downloads or fontconfig setup
+    font_directory = _ensure_font_directory()
+    _configure_fontconfig(font_directory)
+    return _discover_font_families(font_directory)
+
+
+@functools.cache
+def _measuring_context() -> cairo.Context:
+    # A scratch PDF context measures text with the same metrics as the calendar surfaces, while
+    # letting measurements be shared between calendars
+    return cairo.Context(cairo.PDFSurface(None, 1, 1))
+
+
+@functools.lru_cache(maxsize=16)
+def _scaled_font(font_family: str, weight: cairo.FontWeight, font_size: float) -> cairo.ScaledFont:
+    ctx = _measuring_context()
+    ctx.select_font_face(font_family, cairo.FONT_SLANT_NORMAL, weight)
+    ctx.set_font_size(font_size)
+    return ctx.get_scaled_font()
+
+
+@functools.lru_cache(maxsize=4096)
+def _text_size(
+    font_family: str, weight: cairo.FontWeight, font_size: float, text: str
+) -> tuple[float, float]:
+    _, _, width, height, _, _ = _scaled_font(font_family, weight, font_size).text_extents(text)
+    return width, height
 
 
 class LifeCalendar:
@@ -209,6 +351,18 @@ class LifeCalendar:
     AZERO_HEIGHT: float = 2 ** (1 / 4)  # ≈ 1.189m
     AZERO_WIDTH: float = 1 / AZERO_HEIGHT  # ≈ 0.8409m
     MM_PER_PT: float = 0.3528
+    # Arc start/end angles of the top-left, top-right, bottom-right and bottom-left corners
+    CORNER_ANGLES: tuple[tuple[float, float], ...] = (
+        (math.pi, 1.5 * math.pi),
+        (1.5 * math.pi, 2 * math.pi),
+        (0.0, 0.5 * math.pi),
+        (0.5 * math.pi, math.pi),
+    )
+    # Layout ratios relative to BOX_BOUNDS / i.e. column width / i.e. row height
+    BOX_MARGIN_RATIO: float = 35 / 100
+    GAP_SIZE_RATIO: float = 1 * BOX_MARGIN_RATIO
+    BOX_LINE_WIDTH_RATIO: float = 1 / 6 * (1 - BOX_MARGIN_RATIO)
+    CORNER_RADIUS_RATIO: float = 1 / 5 * (1 - BOX_MARGIN_RATIO)
 
     def __init__(
         self,
@@ -248,16 +402,19 @@ class LifeCalendar:
         self.FILENAME: str = filename or DEFAULT_FILENAME
         self.SUBTITLE_TEXT: str | None = subtitle_text
 
+        # Set up fonts before creating the surface, which truncates FILENAME straight away
+        font_families = _font_setup()
+        resolved_font_family = font_family or (font_families[0] if font_families else None)
+        if resolved_font_family is None:
+            raise RuntimeError("No font families available. Unable to continue.")
+        self.FONT: str = resolved_font_family
+
         self.SURFACE: cairo.PDFSurface = cairo.PDFSurface(
             self.FILENAME, self.DOC_WIDTH, self.DOC_HEIGHT
         )
         self.CTX: cairo.Context = cairo.Context(self.SURFACE)
 
         # Constants for layout (can be adjusted manually)
-        resolved_font_family = font_family or (FONT_FAMILIES[0] if FONT_FAMILIES else None)
-        if resolved_font_family is None:
-            raise RuntimeError("No font families available. Unable to continue.")
-        self.FONT: str = resolved_font_family
         self.BIGFONT_SIZE: float = self.DOC_HEIGHT / 30  # ≈ 80pt at A1 size
         self.SMALLFONT_SIZE: float = self.DOC_HEIGHT / 120  # ≈ 20pt at A1 size
         self.TINYFONT_SIZE: float = self.DOC_HEIGHT / 200  # ≈ 12pt at A1 size
@@ -266,46 +423,99 @@ class LifeCalendar:
         min_bottom_margin: float = self.DOC_HEIGHT * 0.05
         min_side_margin: float = self.DOC_WIDTH * 0.10
 
-        # Relative to BOX_BOUNDS / i.e. column width / i.e. row height
-        box_margin_ratio: float = 35 / 100
-        gap_size_ratio: float = 1 * box_margin_ratio
-        box_line_width_ratio: float = 1 / 6 * (1 - box_margin_ratio)
-        corner_radius_ratio: float = 1 / 5 * (1 - box_margin_ratio)
-
         self.GAP_X_INTERVAL: int = 4
         self.GAP_Y_INTERVAL: int = 10
         self.X_GAPS: int = (self.NUM_COLUMNS - 1) // self.GAP_X_INTERVAL
         self.Y_GAPS: int = (self.NUM_ROWS - 1) // self.GAP_Y_INTERVAL
 
         # number of box bounds in grid
-        grid_bounds_x_ratio = self.NUM_COLUMNS - box_margin_ratio + self.X_GAPS * gap_size_ratio
-        grid_bounds_y_ratio = self.NUM_ROWS - box_margin_ratio + self.Y_GAPS * gap_size_ratio
+        grid_bounds_x_ratio = (
+            self.NUM_COLUMNS - self.BOX_MARGIN_RATIO + self.X_GAPS * self.GAP_SIZE_RATIO
+        )
+        grid_bounds_y_ratio = (
+            self.NUM_ROWS - self.BOX_MARGIN_RATIO + self.Y_GAPS * self.GAP_SIZE_RATIO
+        )
         max_box_bounds_x = (self.DOC_WIDTH - 2 * min_side_margin) / grid_bounds_x_ratio
         max_box_bounds_y = (
             self.DOC_HEIGHT - self.TOP_MARGIN - min_bottom_margin
         ) / grid_bounds_y_ratio
         self.BOX_BOUNDS = min(max_box_bounds_x, max_box_bounds_y)
-        self.BOX_MARGIN = box_margin_ratio * self.BOX_BOUNDS
+        self.BOX_MARGIN = self.BOX_MARGIN_RATIO * self.BOX_BOUNDS
         self.BOX_SIZE = self.BOX_BOUNDS - self.BOX_MARGIN
         self.SIDE_MARGIN = (self.DOC_WIDTH - (self.BOX_BOUNDS * grid_bounds_x_ratio)) / 2
 
-        self.CORNER_RADIUS = corner_radius_ratio * self.BOX_BOUNDS
-        self.BOX_LINE_WIDTH = box_line_width_ratio * self.BOX_BOUNDS
+        self.CORNER_RADIUS = self.CORNER_RADIUS_RATIO * self.BOX_BOUNDS
+        self.BOX_LINE_WIDTH = self.BOX_LINE_WIDTH_RATIO * self.BOX_BOUNDS
         self.HEAVY_BOX_LINE_WIDTH = 2 * self.BOX_LINE_WIDTH
-        self.GAP_SIZE = gap_size_ratio * self.BOX_BOUNDS
+        self.GAP_SIZE = self.GAP_SIZE_RATIO * self.BOX_BOUNDS
 
         self.BLACK = (0.2, 0.2, 0.2)
         self.WHITE = (1.0, 1.0, 1.0)
         self.LIGHT_GRAY = (0.7, 0.7, 0.7)
         self.DARK_GRAY = (0.5, 0.5, 0.5)
 
+        # Every square shares the same outline, so build its path once and replay it
+        self._square_path: cairo.Path = self._rounded_square_path()
+
+        # Font (weight, size) currently selected in CTX, see set_font
+        self._font: tuple[cairo.FontWeight, float] | None = None
+        self.set_font(self.TINYFONT_SIZE)
+        # Source color currently set in CTX, see set_rgb
+        self._source_rgb: tuple[float, float, float] | None = None
+
+        # Per-week lookups for the grid, so rows don't re-derive them for every square
+        birth_ordinal = self.BIRTHDATE.toordinal()
+        # Row r spans weeks _row_start_weeks[r] to _row_start_weeks[r + 1] (exclusive), each row
+        # starting on the week of a birthday
+        self._row_start_weeks: list[int] = [
+            (self._birthday(self.BIRTHDATE.year + row).toordinal() - birth_ordinal) // 7
+            for row in range(self.NUM_ROWS + 1)
+        ]
+        self._darkened_weeks: int = 0  # Weeks starting before DARKEN_UNTIL_DATE
+        if self.DARKEN_UNTIL_DATE is not None:
+            days_until = self.DARKEN_UNTIL_DATE.toordinal() - birth_ordinal
+            self._darkened_weeks = max(0, -(-days_until // 7))
+        self._highlight_weeks: frozenset[int] = frozenset(
+            (date.toordinal() - birth_ordinal) // 7 for date in self.HIGHLIGHT_DATES
+        )
+        # Labels of the milestones (xk weeks, xGs) reached during each week
+        self._milestone_tags: dict[int, list[str]] = {}
+        for milestone, suffix in (
+            (datetime.timedelta(days=7000), "k"),
+            (datetime.timedelta(seconds=1_000_000_000), "Gs"),
+        ):
+            for week_index, count in self._milestone_weeks(milestone).items():
+                self._milestone_tags.setdefault(week_index, []).append(f"{count}{suffix}")
+        # x position of the n-th square in a row; the entry after a row's last square is where
+        # its tags start
+        max_row_weeks = max(end - start for start, end in itertools.pairwise(self._row_start_weeks))
+        self._column_xs: list[float] = []
+        pos_x = self.SIDE_MARGIN
+        for week in range(max_row_weeks + 1):
+            self._column_xs.append(pos_x)
+            pos_x += self.BOX_SIZE + self.BOX_MARGIN
+            if week % self.GAP_X_INTERVAL == self.GAP_X_INTERVAL - 1:
+                pos_x += self.GAP_SIZE
+
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def parse_date(datestr: str) -> datetime.date:
+        datestr = datestr.strip()
+
+        # Fast path for plain numeric dates, skipping strptime
+        if match := YMD_DATE_PATTERN.fullmatch(datestr):
+            year, _, month, day = match.groups()
+        elif match := DMY_DATE_PATTERN.fullmatch(datestr):
+            day, _, month, year = match.groups()
+        if match:
+            with contextlib.suppress(ValueError):
+                return datetime.date(int(year), int(month), int(day))
+
         formats = ["%Y/%m/%d", "%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"]
 
         for form in formats:
             try:
-                parsed: datetime.datetime = datetime.datetime.strptime(datestr.strip(), form)  # noqa: DTZ007
+                parsed: datetime.datetime = datetime.datetime.strptime(datestr, form)  # noqa: DTZ007
             except ValueError:
                 continue
             else:
@@ -316,8 +526,7 @@ class LifeCalendar:
     @classmethod
     def parse_darken_until_date(cls, datestr: str) -> datetime.date:
         if datestr == "today":
-            today: datetime.date = datetime.date.today()  # noqa: DTZ011
-            return datetime.date(today.year, today.month, today.day)
+            return datetime.date.today()  # noqa: DTZ011
         return cls.parse_date(datestr)
 
     @classmethod
@@ -326,169 +535,147 @@ class LifeCalendar:
 
     @staticmethod
     def format_date(date: datetime.date) -> str:
-        numerals = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI", "XII"]
-        return f"{date.strftime('%d')} {numerals[date.month - 1].lower()} {date.strftime('%Y')}"
-
-    @staticmethod
-    def is_current_week(
-        now: datetime.date,
-        *,
-        day: int,
-        month: int,
-        year: int | None = None,
-    ) -> bool:
-        end = now + datetime.timedelta(weeks=1)
-        years: list[int] = [now.year, now.year + 1] if year is None else [year]
-
-        for year_try in years:
-            try:
-                date: datetime.date = datetime.date(year_try, month, day)
-            except ValueError:
-                if (month == 2) and (day == 29):  # noqa: PLR2004
-                    # Handle edge case for birthday being on leap year day
-                    date = datetime.date(year_try, month, day - 1)
-                else:
-                    raise
-            if now <= date < end:
-                return True
-
-        return False
-
-    @classmethod
-    def is_special_week(cls, now: datetime.date, dates: list[datetime.date]) -> bool:
-        return any(
-            cls.is_current_week(now, day=date.day, month=date.month, year=date.year)
-            for date in dates
-        )
-
-    def count_1000k_week(self, date: datetime.date) -> int:
-        days_now: int = (date - self.BIRTHDATE).days
-        if (days_now - 7) // 7000 < days_now // 7000:
-            return days_now // 7000
-        return 0
-
-    def count_gigasec_week(self, date: datetime.date) -> int:
-        seconds: float = (date - self.BIRTHDATE).total_seconds()
-        if (
-            seconds - datetime.timedelta(weeks=1).total_seconds()
-        ) // 1_000_000_000 < seconds // 1_000_000_000:
-            return int(seconds // 1_000_000_000)
-        return 0
+        return f"{date.day:02d} {MONTH_NUMERALS[date.month - 1]} {date.year}"
+
+    def _birthday(self, year: int) -> datetime.date:
+        birth = self.BIRTHDATE
+        if (birth.month == 2) and (birth.day == 29) and not calendar.isleap(year):  # noqa: PLR2004
+            # Handle edge case for birthday being on leap year day
+            return birth.replace(year=year, day=28)
+        return birth.replace(year=year)
+
+    def _milestone_weeks(self, milestone: datetime.timedelta) -> dict[int, int]:
+        """Maps week indices (counted from BIRTHDATE) to the milestone reached during that week."""
+        num_weeks = self._row_start_weeks[-1]
+        return {
+            -(-(count * milestone) // WEEK): count
+            for count in range(1, num_weeks * WEEK // milestone + 1)
+        }
 
     def get_new_fill(self, fill: tuple[float, float, float]) -> tuple[float, float, float]:
         if fill == self.WHITE:
             return self.BLACK
         return fill
 
+    def set_font(self, size: float, weight: cairo.FontWeight = cairo.FONT_WEIGHT_NORMAL) -> None:
+        """Selects the calendar font, reusing the cached scaled font used for measuring it."""
+        if (weight, size) != self._font:
+            self.CTX.set_scaled_font(_scaled_font(self.FONT, weight, size))
+            self._font = (weight, size)
+
+    def set_rgb(self, color: tuple[float, float, float]) -> None:
+        """Sets the source color, skipping the Cairo call when it is already selected."""
+        if color != self._source_rgb:
+            self.CTX.set_source_rgb(*color)
+            self._source_rgb = color
+
     def text_size(self, text: str) -> tuple[float, float]:
-        _, _, width, height, _, _ = self.CTX.text_extents(text)
-        return width, height
+        """Measures text in the font last selected with set_font."""
+        return _text_size(self.FONT, *self._font, text)
+
+    def _rounded_square_path(self) -> cairo.Path:
+        """Builds the outline of a square with rounded (circular arc) corners at the origin."""
+        near, far = self.CORNER_RADIUS, self.BOX_SIZE - self.CORNER_RADIUS
+        corner_centers = ((near, near), (far, near), (far, far), (near, far))
+
+        # A fresh path has no current point, so the first arc starts its own subpath
+        self.CTX.new_path()
+        for (cx, cy), (start, end) in zip(corner_centers, self.CORNER_ANGLES, strict=True):
+            self.CTX.arc(cx, cy, self.CORNER_RADIUS, start, end)
+        self.CTX.close_path()
+        path = self.CTX.copy_path()
+        self.CTX.new_path()
+        return path
 
-    def draw_square(
+    def draw_squares(
+        self,
+        positions: list[tuple[float, float]],
+        fillcolor: tuple[float, float, float],
+        linewidth: float,
+    ) -> None:
+        """Draws squares sharing the same style with a single stroke and fill."""
+        # Emit every outline into one path, positioning each by setting the translation directly
+        # (the context is otherwise untransformed)
+        ctx, square_path = self.CTX, self._square_path
+        ctx.save()
+        for pos_x, pos_y in positions:
+            ctx.set_matrix(cairo.Matrix(x0=pos_x, y0=pos_y))
+            ctx.append_path(square_path)
+        ctx.restore()
+
+        # Draw the squares
+        ctx.set_line_width(linewidth)
+        self.set_rgb(self.BLACK)
+        ctx.stroke_preserve()
+
+        # Fill the squares
+        self.set_rgb(fillcolor)
+        ctx.fill()
+
+    def draw_row(
         self,
-        pos_x: float,
         pos_y: float,
-        fillcolor: tuple[float, float, float] | None = None,
-        linewidth: float | None = None,
+        row_index: int,
+        squares: dict[tuple[tuple[float, float, float], float], list[tuple[float, float]]],
     ) -> None:
-        """Draws rectangles with rounded (circular arc) corners."""
-        if fillcolor is None:
-            fillcolor = self.WHITE
-        if linewidth is None:
-            linewidth = self.BOX_LINE_WIDTH
-        self.CTX.set_line_width(linewidth)
-        self.CTX.set_source_rgb(*self.BLACK)
-        self.CTX.move_to(pos_x, pos_y)
-
-        x_1, x_2 = pos_x, pos_x + self.BOX_SIZE
-        y_1, y_2 = pos_y, pos_y + self.BOX_SIZE
-
-        # Define corner positions and corresponding arc start/end angles
-        corners = [
-            (x_1 + self.CORNER_RADIUS, y_1 + self.CORNER_RADIUS, 2, 3),  # Top-left
-            (x_2 - self.CORNER_RADIUS, y_1 + self.CORNER_RADIUS, 3, 4),  # Top-right
-            (x_2 - self.CORNER_RADIUS, y_2 - self.CORNER_RADIUS, 0, 1),  # Bottom-right
-            (x_1 + self.CORNER_RADIUS, y_2 - self.CORNER_RADIUS, 1, 2),  # Bottom-left
-        ]
-
-        # Draw the square
-        self.CTX.new_sub_path()
-        for cx, cy, start, end in corners:
-            self.CTX.arc(cx, cy, self.CORNER_RADIUS, start * (math.pi / 2), end * (math.pi / 2))
-        self.CTX.close_path()
-        self.CTX.stroke_preserve()
-
-        # Fill the square
-        self.CTX.set_source_rgb(*fillcolor)
-        self.CTX.fill()
-
-    def draw_row(self, pos_y: float, date: datetime.date) -> datetime.date:
         """Draws a row of 52 or 53 squares, starting at pos_y.
 
-        Returns:
-            datetime.date: The date of the next row's start
+        Squares are not drawn immediately: their positions are added to `squares`, keyed by
+        (fill color, line width), so that all squares of the same style can be drawn together.
         """
-        pos_x: float = self.SIDE_MARGIN
-        week: int = 0
+        first_week, end_week = self._row_start_weeks[row_index : row_index + 2]
         row_tags: list[str] = []
 
-        # Write the start date of the row
-        self.CTX.set_font_size(self.TINYFONT_SIZE)
-        self.CTX.select_font_face(self.FONT, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
-        self.CTX.set_source_rgb(*self.DARK_GRAY)
-        date_str: str = self.format_date(date)
+        # Write the start date of the row (in the label font and color selected by draw_grid)
+        date_str: str = self.format_date(self.BIRTHDATE + datetime.timedelta(weeks=first_week))
         w, h = self.text_size(date_str)
-        self.CTX.move_to(pos_x - w - self.BOX_SIZE, pos_y + self.BOX_SIZE / 2 + h / 2)
+        self.CTX.move_to(self.SIDE_MARGIN - w - self.BOX_SIZE, pos_y + self.BOX_SIZE / 2 + h / 2)
         self.CTX.show_text(date_str)
 
+        # Bind everything the square loop reads to locals, avoiding attribute lookups per square
+        highlight_weeks = self._highlight_weeks
+        milestone_tags = self._milestone_tags
+        darkened_weeks = self._darkened_weeks
+        white, light_gray = self.WHITE, self.LIGHT_GRAY
+        darkened_fills = {fill: self.get_new_fill(fill) for fill in (white, light_gray)}
+        line_width, heavy_line_width = self.BOX_LINE_WIDTH, self.HEAVY_BOX_LINE_WIDTH
+        column_xs = self._column_xs
+
         # Loop until reaching the next birthday week
-        while week == 0 or not self.is_current_week(
-            date, day=self.BIRTHDATE.day, month=self.BIRTHDATE.month
-        ):
-            fill = self.WHITE
-            width = self.BOX_LINE_WIDTH
-
-            if self.is_special_week(date, dates=self.HIGHLIGHT_DATES):
-                fill = self.LIGHT_GRAY
-            if self.count_1000k_week(date):
-                row_tags.append(f"{self.count_1000k_week(date)}k")
-                width = self.HEAVY_BOX_LINE_WIDTH
-            if self.count_gigasec_week(date):
-                row_tags.append(f"{self.count_gigasec_week(date)}Gs")
-                width = self.HEAVY_BOX_LINE_WIDTH
-            if self.DARKEN_UNTIL_DATE and date < self.DARKEN_UNTIL_DATE:
-                fill = self.get_new_fill(fill)
-
-            self.draw_square(pos_x, pos_y, fillcolor=fill, linewidth=width)
-            pos_x += self.BOX_SIZE + self.BOX_MARGIN
-            if week % self.GAP_X_INTERVAL == self.GAP_X_INTERVAL - 1:
-                pos_x += self.GAP_SIZE
-            week += 1
-            date += datetime.timedelta(weeks=1)
+        for week, week_index in enumerate(range(first_week, end_week)):
+            fill = white
+            width = line_width
+
+            if week_index in highlight_weeks:
+                fill = light_gray
+            if week_tags := milestone_tags.get(week_index):
+                row_tags.extend(week_tags)
+                width = heavy_line_width
+            if week_index < darkened_weeks:
+                fill = darkened_fills[fill]
+
+            squares[fill, width].append((column_xs[week], pos_y))
 
         # Add special tags to the row (xk weeks, xGs)
+        pos_x: float = column_xs[end_week - first_week]
         for tag in row_tags:
-            self.CTX.set_source_rgb(*self.DARK_GRAY)
             w, h = self.text_size(tag)
             self.CTX.move_to(pos_x, pos_y + ((self.BOX_SIZE + h) / 2))
             pos_x += w + self.GAP_SIZE
             self.CTX.show_text(tag)
 
-        return date
-
     def draw_grid(self) -> None:
         """Draws the whole grid of 52x90 squares."""
         pos_x = self.SIDE_MARGIN
         pos_y = self.TOP_MARGIN
 
         # Draw week numbers above top row
-        self.CTX.set_source_rgb(*self.DARK_GRAY)
-        self.CTX.set_font_size(self.TINYFONT_SIZE)
-        self.CTX.select_font_face(self.FONT, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL)
+        self.set_rgb(self.DARK_GRAY)
+        self.set_font(self.TINYFONT_SIZE)
 
         for i in range(self.NUM_COLUMNS):
             if i == 0:
-                text = self.BIRTHDATE.strftime("%A").lower() + "s"
+                text = WEEKDAY_NAMES[self.BIRTHDATE.weekday()] + "s"
                 w, _ = self.text_size(text)
                 self.CTX.move_to(pos_x, pos_y - self.BOX_SIZE)
                 self.CTX.show_text(text)
@@ -503,32 +690,36 @@ class LifeCalendar:
                 pos_x += self.GAP_SIZE
             pos_x += self.BOX_SIZE + self.BOX_MARGIN
 
-        date = self.BIRTHDATE
+        squares: dict[tuple[tuple[float, float, float], float], list[tuple[float, float]]] = (
+            collections.defaultdict(list)
+        )
 
         for i in range(self.NUM_ROWS):
-            date = self.draw_row(pos_y, date)
+            self.draw_row(pos_y, i, squares)
             pos_y += self.BOX_SIZE + self.BOX_MARGIN
             if i % self.GAP_Y_INTERVAL == (self.GAP_Y_INTERVAL - 1):
                 pos_y += self.GAP_SIZE
 
+        for (fill, width), positions in squares.items():
+            self.draw_squares(positions, fillcolor=fill, linewidth=width)
+
     def gen_calendar(self) -> None:
         # Fill background with white
-        self.CTX.set_source_rgb(*self.WHITE)
+        self.set_rgb(self.WHITE)
         self.CTX.rectangle(0, 0, self.DOC_WIDTH, self.DOC_HEIGHT)
         self.CTX.fill()
 
         # Draw title
-        self.CTX.select_font_face(self.FONT, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
-        self.CTX.set_source_rgb(*self.BLACK)
-        self.CTX.set_font_size(self.BIGFONT_SIZE)
+        self.set_font(self.BIGFONT_SIZE, cairo.FONT_WEIGHT_BOLD)
+        self.set_rgb(self.BLACK)
         w_title, h_title = self.text_size(self.TITLE)
         self.CTX.move_to(self.DOC_WIDTH / 2 - w_title / 2, self.TOP_MARGIN / 2)
         self.CTX.show_text(self.TITLE)
 
         # Draw subtitle
         if self.SUBTITLE_TEXT is not None:
-            self.CTX.set_source_rgb(*self.LIGHT_GRAY)
-            self.CTX.set_font_size(self.SMALLFONT_SIZE)
+            self.set_rgb(self.LIGHT_GRAY)
+            self.set_font(self.SMALLFONT_SIZE, cairo.FONT_WEIGHT_BOLD)
             w, h = self.text_size(self.SUBTITLE_TEXT)
             self.CTX.move_to(self.DOC_WIDTH / 2 - w / 2, self.TOP_MARGIN / 2 + h_title - h / 2)
             self.CTX.show_text(self.SUBTITLE_TEXT)
@@ -537,6 +728,8 @@ class LifeCalendar:
         self.draw_grid()
 
         self.CTX.show_page()
+        # Write out the PDF now rather than whenever the surface is garbage collected
+        self.SURFACE.finish()
 
 
 def main() -> None:
@@ -591,20 +784,14 @@ def main() -> None:
         default=None,
     )
 
-    font_help = "Font family to use for rendering text."
-    if FONT_FAMILIES:
-        font_help += " Available bundled options: " + ", ".join(FONT_FAMILIES)
-
-    font_arg_kwargs: dict[str, object] = {
-        "type": str,
-        "dest": "font_family",
-        "default": None,
-        "help": font_help,
-    }
-    if FONT_FAMILIES:
-        font_arg_kwargs["choices"] = FONT_FAMILIES
-
-    parser.add_argument("--font-family", **font_arg_kwargs)
+    parser.add_argument(
+        "--font-family",
+        type=str,
+        dest="font_family",
+        help="Font family to use for rendering text. Available bundled options: "
+        + ", ".join(dict.fromkeys(FONT_FAMILIES_BUILTIN.values())),
+        default=None,
+    )
 
     parser.add_argument(
         "-a",
@@ -639,6 +826,15 @@ def main() -> None:
     )
 
     args: argparse.Namespace = parser.parse_args()
+    # Checked here rather than in an argparse type function, which would replace any font setup
+    # error with a generic "invalid value" message
+    if args.font_family is not None:
+        font_families = _font_setup()
+        if font_families and args.font_family not in font_families:
+            parser.error(
+                f"argument --font-family: invalid choice: '{args.font_family}'"
+                f" (choose from {', '.join(font_families)})"
+            )
 
     # Handle filename extension
     file_path = Path(args.filename)